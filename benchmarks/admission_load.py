@@ -0,0 +1,148 @@
+"""Load test: latency of a well-behaved user while another client floods the API.
+
+Usage:
+    python benchmarks/admission_load.py [--duration 10] [--abusers 32] [--work-ms 200]
+
+Boots gunicorn the way Dockerfile.api does (2 gthread workers x 8 threads,
+--preload), with /api/kubernetes/command slowed down to --work-ms to stand in
+for a real kubectl call. One client floods that route from one address while
+a second client calls it twice a second from another, and a probe polls
+/api/kubernetes/clusters; all arrive through a simulated proxy
+(X-Forwarded-For). The run is repeated with the default admission control
+(concurrency caps and queue shedding only) and with per-client token buckets
+on top (TRUSTED_PROXY_HOPS=1).
+
+When imported (by gunicorn) this module exposes the slowed-down app.
+"""
+import argparse
+import collections
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+if __name__ != '__main__':
+    import sample_flask_kubernetes_api as api
+
+    _run_command = api.app.view_functions['run_command']
+    _work_seconds = float(os.environ.get('BENCH_WORK_MS', '200')) / 1000
+
+    def slow_run_command():
+        time.sleep(_work_seconds)
+        return _run_command()
+
+    api.app.view_functions['run_command'] = slow_run_command
+    app = api.app
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def run(trust_proxy, args):
+    import requests
+
+    port = free_port()
+    url = f'http://127.0.0.1:{port}/api/kubernetes/command'
+    env = dict(os.environ, LOG_LEVEL='ERROR', TRUSTED_PROXY_HOPS='1' if trust_proxy else '0',
+               BENCH_WORK_MS=str(args.work_ms))
+    env.pop('RATE_LIMIT_ENABLED', None)
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--workers=2', '--worker-class=gthread', '--threads=8', '--preload',
+         '--timeout=120', '--graceful-timeout=5', f'--bind=127.0.0.1:{port}', '--log-level=warning',
+         'benchmarks.admission_load:app'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        for _ in range(300):
+            try:
+                requests.get(f'http://127.0.0.1:{port}/api/kubernetes/clusters', timeout=1)
+                break
+            except requests.ConnectionError:
+                time.sleep(0.05)
+
+        stop = time.monotonic() + args.duration
+        abuser_statuses = {}
+        latencies = []
+        good_failures = []
+        probe_latencies = []
+        probe_failures = []
+        lock = threading.Lock()
+
+        def abuser():
+            session = requests.Session()
+            while time.monotonic() < stop:
+                try:
+                    status = session.post(url, json={'command': 'get pods'}, timeout=30,
+                                          headers={'X-Forwarded-For': '203.0.113.66'}).status_code
+                except requests.RequestException as e:
+                    status = type(e).__name__
+                with lock:
+                    abuser_statuses[status] = abuser_statuses.get(status, 0) + 1
+
+        def good_user():
+            session = requests.Session()
+            while time.monotonic() < stop:
+                started = time.perf_counter()
+                response = session.post(url, json={'command': 'get pods'}, timeout=30,
+                                        headers={'X-Forwarded-For': '198.51.100.7'})
+                latencies.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    good_failures.append(response.status_code)
+                time.sleep(0.5)
+
+        def probe():
+            session = requests.Session()
+            while time.monotonic() < stop:
+                started = time.perf_counter()
+                try:
+                    status = session.get(f'http://127.0.0.1:{port}/api/kubernetes/clusters', timeout=10).status_code
+                except requests.RequestException as e:
+                    status = type(e).__name__
+                probe_latencies.append((time.perf_counter() - started) * 1000)
+                if status != 200:
+                    probe_failures.append(status)
+                time.sleep(0.2)
+
+        threads = [threading.Thread(target=abuser) for _ in range(args.abusers)]
+        threads.append(threading.Thread(target=good_user))
+        threads.append(threading.Thread(target=probe))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        server.terminate()
+        server.wait(30)
+
+    print('caps and shedding + per-client buckets' if trust_proxy else 'caps and shedding (default)')
+    for name, samples, failures in (('well-behaved user', latencies, good_failures),
+                                    ('probe', probe_latencies, probe_failures)):
+        samples.sort()
+        print(f"  {name + ':':<19}n={len(samples)} p50={statistics.median(samples):.0f}ms "
+              f"p95={samples[int(len(samples) * 0.95) - 1]:.0f}ms max={samples[-1]:.0f}ms "
+              f"failures={dict(collections.Counter(failures)) or 'none'}")
+    print(f"  flooding client:   {dict(sorted(abuser_statuses.items(), key=str))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--abusers', type=int, default=32, help='concurrent connections of the flooding client')
+    parser.add_argument('--work-ms', type=int, default=200, help='simulated cost of /api/kubernetes/command')
+    args = parser.parse_args()
+
+    for trust_proxy in (False, True):
+        run(trust_proxy, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Response size and latency per endpoint for each content encoding.
+
+Usage:
+    python benchmarks/compression.py [--repeat 20] [--file-kb 1024]
+
+Requests go through the Flask test client, so latency covers serialization,
+ETag hashing and compression but no network transfer. Each endpoint is
+measured with identity, every encoding the app supports in this environment
+(gzip always, br/zstd when brotli/zstandard are installed) and as a
+revalidation with If-None-Match.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('RATE_LIMIT_ENABLED', '0')
+
+import sample_flask_kubernetes_api as api  # noqa: E402
+
+
+def write_debug_file(directory, size_kb):
+    lines = []
+    size = 0
+    while size < size_kb * 1024:
+        line = (f"2026-10-19T06:{random.randint(0, 59):02d}:00Z level=info pod=api-{random.randint(1, 50)} "
+                f"msg=\"reconcile loop finished\" duration={random.random():.4f}s\n")
+        lines.append(line)
+        size += len(line)
+    with open(os.path.join(directory, 'bench.log'), 'w') as debug_file:
+        debug_file.write(''.join(lines))
+
+
+def measure(client, path, headers, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(path, headers=headers)
+        timings.append((time.perf_counter() - start) * 1000)
+    return len(response.data), statistics.median(timings), response
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--file-kb', type=int, default=1024, help='size of the debug file served by /api/kubernetes/file')
+    args = parser.parse_args()
+
+    endpoints = [
+        '/api/kubernetes/file?filePath=bench.log',
+        '/api/kubernetes/namespace-issues?namespace=namespace-a',
+        '/api/access/groups?userEmail=user@example.com',
+        '/api/kubernetes/clusters',
+    ]
+    encodings = ['identity'] + [name for name, _ in api.response_encoders]
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ['DEBUG_FILES_DIR'] = directory
+        write_debug_file(directory, args.file_kb)
+        client = api.app.test_client()
+
+        print(f"{'endpoint':<55} {'requested':<14} {'sent':<9} {'bytes':>10} {'saved':>7} {'median ms':>10}")
+        for path in endpoints:
+            identity_bytes = None
+            etag = None
+            for encoding in encodings:
+                size, latency, response = measure(client, path, {'Accept-Encoding': encoding}, args.repeat)
+                identity_bytes = identity_bytes or size
+                etag = response.headers.get('ETag')
+                used = response.headers.get('Content-Encoding', 'identity')
+                saved = 1 - size / identity_bytes
+                print(f"{path:<55} {encoding:<14} {used:<9} {size:>10} {saved:>6.0%} {latency:>10.2f}")
+            size, latency, response = measure(client, path, {'If-None-Match': etag}, args.repeat)
+            print(f"{path:<55} {'If-None-Match':<14} {response.status_code:<9} {size:>10} "
+                  f"{1 - size / identity_bytes:>6.0%} {latency:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
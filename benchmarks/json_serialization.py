@@ -0,0 +1,94 @@
+"""Serialization microbenchmark for the JSON response path.
+
+Usage:
+    python benchmarks/json_serialization.py [--repeat 20] [--items 5000]
+
+Compares flask.jsonify in debug mode (how the dev server runs), the app's
+jsonify on the stdlib fallback and on orjson, and streamed array encoding,
+for a large issue list and a multi-MB file body.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+
+import flask  # noqa: E402
+
+import sample_flask_kubernetes_api as api  # noqa: E402
+
+
+def timed(build, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = build()
+        timings.append((time.perf_counter() - start) * 1000)
+    tracemalloc.start()
+    build()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), size, peak
+
+
+def with_orjson(enabled, build):
+    def run():
+        previous = api.ORJSON_AVAILABLE
+        api.ORJSON_AVAILABLE = enabled and previous
+        try:
+            return build()
+        finally:
+            api.ORJSON_AVAILABLE = previous
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--items', type=int, default=5000)
+    parser.add_argument('--file-mb', type=int, default=3)
+    args = parser.parse_args()
+
+    issues = [
+        {"issue": f"High CPU Usage {i}", "kind": "Pod", "name": f"pod-{i}",
+         "labels": {"app": "api", "tier": "backend"}, "restarts": i}
+        for i in range(args.items)
+    ]
+    file_body = {"content": "level=info msg=\"reconcile loop finished\"\n" * (args.file_mb * 1024 * 1024 // 40),
+                 "contentType": "text/plain", "lastModified": "2026-10-19T06:30:00"}
+
+    def flask_debug(data):
+        return lambda: len(flask.jsonify(data).get_data())
+
+    def app_jsonify(data):
+        return lambda: len(api.jsonify(data).get_data())
+
+    def streamed(data):
+        return lambda: sum(len(chunk) for chunk in api.stream_json_array(data))
+
+    cases = [
+        (f"{args.items}-item list", 'flask.jsonify (debug)', flask_debug(issues)),
+        (f"{args.items}-item list", 'jsonify stdlib', with_orjson(False, app_jsonify(issues))),
+        (f"{args.items}-item list", 'jsonify orjson', with_orjson(True, app_jsonify(issues))),
+        (f"{args.items}-item list", 'streamed orjson', with_orjson(True, streamed(issues))),
+        (f"{args.file_mb} MB file body", 'flask.jsonify (debug)', flask_debug(file_body)),
+        (f"{args.file_mb} MB file body", 'jsonify stdlib', with_orjson(False, app_jsonify(file_body))),
+        (f"{args.file_mb} MB file body", 'jsonify orjson', with_orjson(True, app_jsonify(file_body))),
+    ]
+
+    api.app.debug = True
+    print(f"orjson installed: {api.ORJSON_AVAILABLE}")
+    print(f"{'payload':<18} {'serializer':<22} {'median ms':>10} {'bytes':>10} {'peak KB':>9}")
+    with api.app.test_request_context():
+        for payload, name, build in cases:
+            latency, size, peak = timed(build, args.repeat)
+            print(f"{payload:<18} {name:<22} {latency:>10.2f} {size:>10} {peak / 1024:>9.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""Shutdown harness: what happens to in-flight and new requests on SIGTERM.
+
+Usage:
+    python benchmarks/shutdown_drain.py [--requests 8] [--work-ms 2000]
+
+Boots gunicorn the way Dockerfile.api does (2 gthread workers x 8 threads,
+--preload, gunicorn.conf.py), with /api/kubernetes/command slowed down to
+--work-ms. Starts --requests slow requests, sends SIGTERM to the master while
+they are running and tries a new request during the drain. Reports how the
+in-flight requests ended, what the late request got, how long the server took
+to exit and the workers' "Shutdown complete" log records.
+
+When imported (by gunicorn) this module exposes the slowed-down app.
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+if __name__ != '__main__':
+    import sample_flask_kubernetes_api as api
+
+    _run_command = api.app.view_functions['run_command']
+    _work_seconds = float(os.environ.get('BENCH_WORK_MS', '2000')) / 1000
+
+    def slow_run_command():
+        time.sleep(_work_seconds)
+        return _run_command()
+
+    api.app.view_functions['run_command'] = slow_run_command
+    app = api.app
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=8, help='requests in flight when SIGTERM arrives')
+    parser.add_argument('--work-ms', type=int, default=2000, help='simulated cost of /api/kubernetes/command')
+    parser.add_argument('--grace-seconds', type=float, default=25, help='SHUTDOWN_GRACE_SECONDS')
+    args = parser.parse_args()
+
+    import requests
+
+    port = free_port()
+    url = f'http://127.0.0.1:{port}/api/kubernetes/command'
+    # Concurrency caps off, so every request is in flight when SIGTERM arrives
+    env = dict(os.environ, LOG_LEVEL='INFO', BENCH_WORK_MS=str(args.work_ms),
+               SHUTDOWN_GRACE_SECONDS=str(args.grace_seconds), CONCURRENCY_LIMITS='')
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--workers=2', '--worker-class=gthread', '--threads=8', '--preload',
+         '--timeout=120', '--graceful-timeout=30', f'--bind=127.0.0.1:{port}', '--log-level=warning',
+         '--config=gunicorn.conf.py', 'benchmarks.shutdown_drain:app'],
+        cwd=ROOT, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+    )
+    output = []
+    reader = threading.Thread(target=lambda: output.extend(server.stdout), daemon=True)
+    reader.start()
+    try:
+        for _ in range(300):
+            try:
+                requests.get(f'http://127.0.0.1:{port}/api/kubernetes/clusters', timeout=1)
+                break
+            except requests.ConnectionError:
+                time.sleep(0.05)
+
+        results = []
+        lock = threading.Lock()
+
+        def in_flight_request():
+            try:
+                outcome = requests.post(url, json={'command': 'get pods'}, timeout=60).status_code
+            except requests.RequestException as e:
+                outcome = type(e).__name__
+            with lock:
+                results.append(outcome)
+
+        threads = [threading.Thread(target=in_flight_request) for _ in range(args.requests)]
+        for thread in threads:
+            thread.start()
+        # Let the requests reach the workers before shutting down
+        time.sleep(min(0.5, args.work_ms / 4000))
+
+        signalled = time.perf_counter()
+        server.send_signal(signal.SIGTERM)
+        time.sleep(0.2)
+        try:
+            late = requests.post(url, json={'command': 'get pods'}, timeout=5)
+            late_outcome = f"{late.status_code} Retry-After={late.headers.get('Retry-After')}"
+        except requests.RequestException as e:
+            late_outcome = type(e).__name__
+
+        for thread in threads:
+            thread.join()
+        requests_done_ms = (time.perf_counter() - signalled) * 1000
+        server.wait(60)
+        exit_ms = (time.perf_counter() - signalled) * 1000
+    finally:
+        if server.poll() is None:
+            server.kill()
+            server.wait()
+    reader.join(5)
+
+    completed = results.count(200)
+    print(f"in-flight requests: {completed}/{args.requests} completed, "
+          f"failed={[outcome for outcome in results if outcome != 200] or 'none'}")
+    print(f"request during drain: {late_outcome}")
+    print(f"in-flight finished {requests_done_ms:.0f}ms after SIGTERM, server exited after {exit_ms:.0f}ms "
+          f"(exit code {server.returncode})")
+    for line in output:
+        if 'Shutdown complete' not in line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            print(f"  {line.rstrip()}")
+            continue
+        fields = ('drained', 'in_flight_abandoned', 'rejected_while_draining', 'shutdown_ms')
+        # The master imports the app under --preload too, but never drains
+        label = 'worker' if record.get('shutdown_ms') else 'master'
+        print(f"  {label} shutdown: " + ' '.join(f"{field}={record.get(field)}" for field in fields))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""Startup benchmark: import time, time to first request and memory per worker.
+
+Usage:
+    python benchmarks/startup.py [--runs 5] [--gunicorn] [--workers 2]
+
+The first part imports the app in fresh interpreters and serves one request
+through the Flask test client. With --gunicorn it also boots gunicorn with and
+without --preload and reports time to first response plus RSS and PSS
+(proportional set size, which shows copy-on-write sharing) per worker.
+Memory figures are read from /proc and are only available on Linux.
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULE = 'sample_flask_kubernetes_api'
+
+COLD_START = f"""
+import json, resource, sys, time
+sys.path.insert(0, {ROOT!r})
+start = time.perf_counter()
+import {MODULE} as api
+imported = time.perf_counter()
+api.app.test_client().get('/api/kubernetes/clusters')
+served = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (imported - start) * 1000,
+    "first_request_ms": (served - start) * 1000,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "heavy_modules_loaded": sorted(m for m in ('boto3', 'botocore', 'requests', 'onelogin') if m in sys.modules)
+}}))
+"""
+
+
+def cold_start(runs):
+    env = dict(os.environ, LOG_LEVEL='ERROR')
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', COLD_START], env=env, check=True,
+                                capture_output=True, text=True).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    print(f"cold start ({runs} runs, median)")
+    for key in ('import_ms', 'first_request_ms', 'max_rss_mb'):
+        print(f"  {key:<18} {statistics.median(s[key] for s in samples):8.1f}")
+    print(f"  heavy modules loaded: {samples[0]['heavy_modules_loaded'] or 'none'}")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def memory_kb(pid):
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as rollup:
+        for line in rollup:
+            parts = line.split()
+            if parts[0] in ('Rss:', 'Pss:'):
+                fields[parts[0][:-1].lower()] = int(parts[1])
+    return fields
+
+
+def gunicorn_start(workers, preload):
+    port = free_port()
+    command = [sys.executable, '-m', 'gunicorn', f'--workers={workers}', f'--bind=127.0.0.1:{port}',
+               '--log-level=warning', f'{MODULE}:app']
+    if preload:
+        command.insert(3, '--preload')
+    env = dict(os.environ, LOG_LEVEL='ERROR')
+    started = time.perf_counter()
+    server = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            try:
+                urllib.request.urlopen(f'http://127.0.0.1:{port}/api/kubernetes/clusters', timeout=1).read()
+                break
+            except OSError:
+                if time.perf_counter() - started > 30:
+                    raise RuntimeError('gunicorn did not start within 30s')
+                time.sleep(0.01)
+        first_response_ms = (time.perf_counter() - started) * 1000
+        # Give every worker time to finish booting before measuring memory
+        time.sleep(1)
+        children = subprocess.run(['pgrep', '-P', str(server.pid)], capture_output=True, text=True).stdout.split()
+        memory = [memory_kb(pid) for pid in children]
+    finally:
+        server.terminate()
+        server.wait(30)
+
+    label = 'with --preload' if preload else 'without --preload'
+    print(f"gunicorn {workers} workers {label}")
+    print(f"  first_response_ms  {first_response_ms:8.1f}")
+    for index, worker in enumerate(memory):
+        print(f"  worker {index}: rss {worker['rss'] / 1024:6.1f} MB  pss {worker['pss'] / 1024:6.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--gunicorn', action='store_true', help='also benchmark gunicorn worker boot')
+    parser.add_argument('--workers', type=int, default=2)
+    args = parser.parse_args()
+
+    cold_start(args.runs)
+    if args.gunicorn:
+        for preload in (False, True):
+            gunicorn_start(args.workers, preload)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,15 @@
+"""gunicorn settings shared by the API image and the benchmark harnesses.
+
+Command line flags (see Dockerfile.api) configure the server itself; this file
+only holds the server hooks.
+"""
+import sys
+
+
+def post_worker_init(worker):
+    # gunicorn has just installed the worker's signal handlers over the ones
+    # the app registered at import time; chain the app's draining back in
+    app_module = sys.modules.get(worker.wsgi.import_name)
+    install_hook = getattr(app_module, 'install_worker_shutdown_hook', None)
+    if install_hook is not None:
+        install_hook(worker)
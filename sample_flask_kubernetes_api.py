@@ -1,35 +1,841 @@
-from flask import Flask, request, jsonify, redirect, session, url_for, make_response
+from flask import Flask, request, redirect, session, url_for, make_response, g, has_request_context
+from flask.logging import default_handler
 from flask_cors import CORS
 import time
 import random
 import uuid
 import os
 import json
+import re
 from urllib.parse import quote
 import base64
 import ssl
-import requests
 import signal
 import sys
 import atexit
-import boto3
-from botocore.exceptions import ClientError
+import logging
+import logging.handlers
+import queue
+import threading
+import collections
+import contextlib
+import cProfile
+import pstats
+import marshal
+import io
+import hmac
+import gc
+import gzip
+import zlib
+import hashlib
+import importlib.util
+import math
+import heapq
+import _thread
+from werkzeug.wsgi import ClosingIterator
 
-# Conditionally import SAML libraries - will fail gracefully if not installed
+# Structured logging configuration
+# Records are pushed onto an in-memory queue by the request thread and are
+# formatted as JSON and written to stdout by a background listener thread
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+
+# Per-route sampling for high-volume endpoints, e.g. "/api/about/health=0.01".
+# Sampling only applies to INFO/DEBUG records; warnings, errors and 5xx
+# responses are always logged
+LOG_SAMPLE_RATES = {}
+for _entry in os.environ.get('LOG_SAMPLE_RATES', '/api/kubernetes/clusters=0.01,/api/about/health=0.01').split(','):
+    if '=' in _entry:
+        _route, _rate = _entry.rsplit('=', 1)
+        try:
+            LOG_SAMPLE_RATES[_route.strip()] = float(_rate)
+        except ValueError:
+            pass
+
+# Attributes present on every LogRecord; anything else was passed via extra=
+_RESERVED_LOG_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+class JsonLogFormatter(logging.Formatter):
+    """Format log records as single-line JSON objects"""
+    def format(self, record):
+        entry = {
+            "ts": time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_LOG_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class RequestContextFilter(logging.Filter):
+    """Attach correlation ID and timing fields, and apply per-route sampling"""
+    def filter(self, record):
+        if not has_request_context() or 'request_id' not in g:
+            return True
+        if record.levelno < logging.WARNING and not g.get('log_sampled', True):
+            return False
+        record.request_id = g.request_id
+        record.method = request.method
+        record.path = request.path
+        if not hasattr(record, 'elapsed_ms'):
+            record.elapsed_ms = round((time.perf_counter() - g.request_start) * 1000, 2)
+        return True
+
+class StructuredQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that leaves JSON formatting to the listener thread"""
+    def prepare(self, record):
+        # Resolve the message and traceback while still on the request thread,
+        # since args and exc_info may not be safe to touch later
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+log_queue = queue.Queue(-1)
+_log_stream_handler = logging.StreamHandler(sys.stdout)
+_log_stream_handler.setFormatter(JsonLogFormatter())
+log_listener = logging.handlers.QueueListener(log_queue, _log_stream_handler, respect_handler_level=True)
+
+_log_queue_handler = StructuredQueueHandler(log_queue)
+_log_queue_handler.addFilter(RequestContextFilter())
+
+logger = logging.getLogger('ai_assistant')
+logger.setLevel(LOG_LEVEL)
+logger.addHandler(_log_queue_handler)
+logger.propagate = False
+
+log_listener.start()
+
+def stop_log_listener():
+    """Flush queued log records and stop the listener thread (idempotent)"""
+    if log_listener._thread is not None:
+        log_listener.stop()
+
+# Heavy dependencies (boto3, requests, onelogin.saml2) are imported lazily on
+# first use so worker boot does not pay for them. Only check that the SAML
+# libraries are installed here - they are imported by init_saml_auth().
 try:
-    from onelogin.saml2.auth import OneLogin_Saml2_Auth
-    from onelogin.saml2.settings import OneLogin_Saml2_Settings
-    from onelogin.saml2.utils import OneLogin_Saml2_Utils
-    SAML_ENABLED = True
+    SAML_ENABLED = importlib.util.find_spec('onelogin.saml2') is not None
 except ImportError:
     SAML_ENABLED = False
-    print("Warning: SAML libraries not installed. SAML authentication will be disabled.")
+if not SAML_ENABLED:
+    logger.warning("SAML libraries not installed. SAML authentication will be disabled.")
 
 app = Flask(__name__)
 
+# Route Flask's unhandled-exception tracebacks and the development server's
+# log through the same queue, instead of writing plain text to stderr
+for _framework_logger in (app.logger, logging.getLogger('werkzeug')):
+    _framework_logger.removeHandler(default_handler)
+    _framework_logger.setLevel(LOG_LEVEL)
+    _framework_logger.addHandler(_log_queue_handler)
+    _framework_logger.propagate = False
+
+# Incoming correlation IDs are only reused when they look like one
+REQUEST_ID_PATTERN = re.compile(r'^[A-Za-z0-9._:-]{1,64}$')
+
+# JSON serialization
+# Flask 2.0's jsonify always goes through the stdlib json module and pretty
+# prints in debug mode. This replacement emits compact UTF-8 output, using
+# orjson when it is installed and the stdlib encoder otherwise.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+ORJSON_AVAILABLE = orjson is not None
+# Lists at least this long are streamed in chunks instead of built in memory.
+# Streamed responses are gzipped on the fly but not given an ETag.
+JSON_STREAM_MIN_ITEMS = int(os.environ.get('JSON_STREAM_MIN_ITEMS', '10000'))
+JSON_STREAM_CHUNK_BYTES = 64 * 1024
+
+def json_default(obj):
+    """Serialize types orjson does not know about with Flask's encoder rules"""
+    return app.json_encoder().default(obj)
+
+def json_dumps(obj):
+    """Serialize obj to compact JSON bytes"""
+    if ORJSON_AVAILABLE:
+        try:
+            # Dates go through json_default so they match the stdlib path
+            return orjson.dumps(
+                obj,
+                default=json_default,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+            )
+        except TypeError:
+            # e.g. integers wider than 64 bits; let the stdlib encoder handle them
+            pass
+    return json.dumps(obj, cls=app.json_encoder, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def stream_json_array(items):
+    """Encode an iterable as a JSON array in chunks rather than one large buffer"""
+    chunk = [b'[']
+    size = 1
+    for index, item in enumerate(items):
+        encoded = json_dumps(item)
+        if index:
+            chunk.append(b',')
+        chunk.append(encoded)
+        size += len(encoded) + 1
+        if size >= JSON_STREAM_CHUNK_BYTES:
+            yield b''.join(chunk)
+            chunk = []
+            size = 0
+    chunk.append(b']')
+    yield b''.join(chunk)
+
+def jsonify(*args, **kwargs):
+    """Drop-in replacement for flask.jsonify using json_dumps"""
+    if args and kwargs:
+        raise TypeError("jsonify() behavior undefined when passed both args and kwargs")
+    if len(args) == 1:
+        data = args[0]
+    else:
+        data = list(args) or kwargs
+    
+    mimetype = app.config['JSONIFY_MIMETYPE']
+    if isinstance(data, list) and len(data) >= JSON_STREAM_MIN_ITEMS:
+        return app.response_class(stream_json_array(data), mimetype=mimetype)
+    return app.response_class(json_dumps(data), mimetype=mimetype)
+
+# Request correlation and access logging
+@app.before_request
+def start_request_logging():
+    """Assign a correlation ID and start the request timer"""
+    g.request_start = time.perf_counter()
+    request_id = request.headers.get('X-Request-ID', '')
+    g.request_id = request_id if REQUEST_ID_PATTERN.match(request_id) else uuid.uuid4().hex
+    rate = LOG_SAMPLE_RATES.get(request.path, 1.0)
+    g.log_sampled = rate >= 1.0 or random.random() < rate
+
+@app.after_request
+def finish_request_logging(response):
+    """Emit one access log record per request and echo the correlation ID"""
+    if 'request_id' not in g:
+        return response
+    duration_ms = round((time.perf_counter() - g.request_start) * 1000, 2)
+    response.headers['X-Request-ID'] = g.request_id
+    if response.status_code >= 500:
+        level = logging.ERROR
+    elif duration_ms >= SLOW_REQUEST_MS:
+        level = logging.WARNING
+    else:
+        level = logging.INFO
+    if level >= logging.WARNING:
+        # Server errors and slow requests bypass sampling
+        g.log_sampled = True
+    fields = {
+        "status": response.status_code,
+        "elapsed_ms": duration_ms,
+        "response_bytes": response.calculate_content_length()
+    }
+    if 'uncompressed_bytes' in g:
+        fields["uncompressed_bytes"] = g.uncompressed_bytes
+        fields["content_encoding"] = response.headers.get('Content-Encoding')
+    logger.log(level, "request completed", extra=fields)
+    return response
+
+# Request profiling
+# Profiling is opt-in: a request is profiled only when it carries the
+# X-Profile header together with a valid admin token, or when it is picked by
+# PROFILE_SAMPLE_RATE. Untriggered requests only pay for one dict lookup.
+PROFILING_ADMIN_TOKEN = os.environ.get('PROFILING_ADMIN_TOKEN', '')
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', '0'))
+PROFILE_RING_SIZE = int(os.environ.get('PROFILE_RING_SIZE', '50'))
+SLOW_REQUEST_MS = float(os.environ.get('SLOW_REQUEST_MS', '1000'))
+
+# Bounded ring of captured profiles, oldest evicted first
+captured_profiles = collections.deque(maxlen=PROFILE_RING_SIZE)
+captured_profiles_lock = threading.Lock()
+
+class _CapturedStats:
+    """Adapter so pstats.Stats can load a stored stats dict"""
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+def is_admin_request():
+    """Check the admin token used to trigger profiling and read profiles"""
+    if not PROFILING_ADMIN_TOKEN:
+        return False
+    # Headers are decoded as latin-1; compare the raw bytes the client sent
+    try:
+        token = request.headers.get('X-Admin-Token', '').encode('latin-1')
+    except UnicodeEncodeError:
+        return False
+    return hmac.compare_digest(token, PROFILING_ADMIN_TOKEN.encode('utf-8'))
+
+@contextlib.contextmanager
+def track_upstream(service, operation):
+    """Record wall time of an upstream call (S3, GitHub, ...) for profiled requests"""
+    timings = g.get('upstream_timings') if has_request_context() else None
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.append({
+            "service": service,
+            "operation": operation,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 2)
+        })
+
+@app.before_request
+def start_request_profiling():
+    """Enable cProfile for explicitly requested or sampled requests"""
+    forced = 'X-Profile' in request.headers and is_admin_request()
+    if not forced and not (PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE):
+        return
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another profiler is already active in this process
+        return
+    g.profiler = profiler
+    g.profile_forced = forced
+    g.upstream_timings = []
+
+def finish_request_profiling(status_code):
+    """Stop the profiler and keep the profile if the request was slow or forced"""
+    profiler = g.pop('profiler', None)
+    if profiler is None:
+        return None
+    profiler.disable()
+    duration_ms = round((time.perf_counter() - g.request_start) * 1000, 2)
+    if not g.get('profile_forced') and duration_ms < SLOW_REQUEST_MS:
+        return None
+    profiler.create_stats()
+    profile = {
+        "id": uuid.uuid4().hex,
+        "requestId": g.request_id,
+        "method": request.method,
+        "path": request.path,
+        "status": status_code,
+        "elapsed_ms": duration_ms,
+        "capturedAt": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        "forced": g.get('profile_forced', False),
+        "upstream": g.get('upstream_timings', []),
+        "stats": profiler.stats
+    }
+    with captured_profiles_lock:
+        captured_profiles.append(profile)
+    logger.warning("Captured request profile", extra={"profile_id": profile["id"], "elapsed_ms": duration_ms})
+    return profile
+
+@app.after_request
+def capture_request_profile(response):
+    """Attach the profile ID to responses whose profile was captured"""
+    if 'profiler' in g:
+        profile = finish_request_profiling(response.status_code)
+        if profile is not None:
+            response.headers['X-Profile-ID'] = profile["id"]
+    return response
+
+@app.teardown_request
+def discard_request_profiler(exc=None):
+    """Make sure the profiler is disabled when a request fails with an exception"""
+    if 'profiler' in g:
+        finish_request_profiling(500)
+
+# Response compression and conditional requests
+# Compressible responses above COMPRESSION_MIN_BYTES are encoded with the best
+# encoding the client accepts (zstd and brotli only when their packages are
+# installed). JSON responses to GET requests get a weak ETag so clients can
+# revalidate with If-None-Match and receive a 304 instead of the full body.
+# The read-only endpoints that also accept POST have GET variants for this.
+COMPRESSION_MIN_BYTES = int(os.environ.get('COMPRESSION_MIN_BYTES', '1024'))
+# Send the uncompressed body when compression saves less than this fraction
+COMPRESSION_MIN_SAVING = float(os.environ.get('COMPRESSION_MIN_SAVING', '0.1'))
+# Larger bodies are only compressed when a trial run on their first
+# COMPRESSION_SAMPLE_BYTES achieves COMPRESSION_MIN_SAVING
+COMPRESSION_SAMPLE_BYTES = 64 * 1024
+GZIP_LEVEL = int(os.environ.get('GZIP_LEVEL', '6'))
+BROTLI_QUALITY = int(os.environ.get('BROTLI_QUALITY', '4'))
+ZSTD_LEVEL = int(os.environ.get('ZSTD_LEVEL', '3'))
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json', 'application/xml', 'application/yaml', 'application/javascript',
+    'text/plain', 'text/html', 'text/xml', 'text/css'
+}
+
+def compress_zstd(data):
+    import zstandard
+    return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+
+def compress_brotli(data):
+    import brotli
+    return brotli.compress(data, quality=BROTLI_QUALITY)
+
+def compress_gzip(data):
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+# Available encoders in server preference order
+response_encoders = [('gzip', compress_gzip)]
+if importlib.util.find_spec('brotli') is not None:
+    response_encoders.insert(0, ('br', compress_brotli))
+if importlib.util.find_spec('zstandard') is not None:
+    response_encoders.insert(0, ('zstd', compress_zstd))
+
+def gzip_stream(chunks):
+    """Gzip a streamed body chunk by chunk"""
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+def negotiate_encoding():
+    """Pick the encoder the client accepts with the highest quality"""
+    best = None
+    best_quality = 0
+    for name, encoder in response_encoders:
+        quality = request.accept_encodings.quality(name)
+        if quality > best_quality:
+            best, best_quality = (name, encoder), quality
+    return best
+
+@app.after_request
+def optimize_response(response):
+    """Add ETags, answer If-None-Match with 304 and compress large bodies"""
+    if response.direct_passthrough or response.status_code != 200:
+        return response
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES or 'Content-Encoding' in response.headers:
+        return response
+    
+    if response.is_streamed:
+        # Streamed bodies (large JSON arrays) have no size up front and are
+        # big by construction; gzip them as they are sent
+        response.vary.add('Accept-Encoding')
+        if request.accept_encodings.quality('gzip') > 0:
+            response.response = gzip_stream(response.response)
+            response.headers['Content-Encoding'] = 'gzip'
+        return response
+    
+    data = response.get_data()
+    response.vary.add('Accept-Encoding')
+    
+    if request.method in ('GET', 'HEAD') and response.mimetype == 'application/json' and 'ETag' not in response.headers:
+        response.set_etag(hashlib.blake2b(data, digest_size=16).hexdigest(), weak=True)
+        etag, _ = response.get_etag()
+        if request.if_none_match.contains_weak(etag):
+            response.status_code = 304
+            response.set_data(b'')
+            response.headers.pop('Content-Type', None)
+            response.headers.pop('Content-Length', None)
+            return response
+    
+    if len(data) < COMPRESSION_MIN_BYTES:
+        return response
+    
+    encoding = negotiate_encoding()
+    if encoding is None:
+        return response
+    
+    name, encoder = encoding
+    if len(data) > COMPRESSION_SAMPLE_BYTES:
+        sample = data[:COMPRESSION_SAMPLE_BYTES]
+        if len(encoder(sample)) > len(sample) * (1 - COMPRESSION_MIN_SAVING):
+            # Most likely already compressed or random; don't spend CPU on the rest
+            return response
+    
+    compressed = encoder(data)
+    if len(compressed) > len(data) * (1 - COMPRESSION_MIN_SAVING):
+        # Not worth it - spare the client the decompression
+        return response
+    
+    g.uncompressed_bytes = len(data)
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = name
+    return response
+
+# Lifecycle management
+# In-flight requests are counted at the WSGI layer so streamed responses stay
+# tracked until their body has been sent. On SIGTERM the app stops admitting
+# new requests (503 with Connection: close, which also fails the readiness
+# probe), waits up to SHUTDOWN_GRACE_SECONDS for in-flight requests to finish
+# and only then closes pooled clients. Keep the grace period below gunicorn's
+# --graceful-timeout.
+#
+# gunicorn installs its own signal handlers in every worker after the app is
+# imported, so under gunicorn the handler is attached per worker by the
+# post_worker_init hook in gunicorn.conf.py. The worker then stops accepting
+# connections and lets its in-flight requests finish before exiting.
+SHUTDOWN_GRACE_SECONDS = float(os.environ.get('SHUTDOWN_GRACE_SECONDS', '25'))
+
+class RequestLifecycle:
+    """Track in-flight requests and shutdown progress for one worker"""
+    def __init__(self):
+        self.in_flight = 0
+        self.dropped = 0
+        self.draining = False
+        self.drain_started = None
+        self.closed = False
+        self._idle = threading.Condition()
+
+    def request_started(self):
+        with self._idle:
+            self.in_flight += 1
+
+    def request_finished(self):
+        with self._idle:
+            self.in_flight -= 1
+            if self.in_flight <= 0:
+                self._idle.notify_all()
+
+    def begin_draining(self):
+        """Stop admitting requests, returning False if already draining"""
+        with self._idle:
+            if self.draining:
+                return False
+            self.draining = True
+            self.drain_started = time.monotonic()
+            return True
+
+    def record_rejected(self):
+        """Count a request turned away while draining"""
+        with self._idle:
+            self.dropped += 1
+
+    def wait_for_drain(self, timeout):
+        """Wait until no requests are in flight, returning True if drained"""
+        with self._idle:
+            return self._idle.wait_for(lambda: self.in_flight <= 0, timeout)
+
+lifecycle = RequestLifecycle()
+
+class LifecycleMiddleware:
+    """WSGI middleware counting requests until their response is closed"""
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        lifecycle.request_started()
+        try:
+            body = self.wsgi_app(environ, start_response)
+        except BaseException:
+            lifecycle.request_finished()
+            raise
+        return ClosingIterator(body, lifecycle.request_finished)
+
+app.wsgi_app = LifecycleMiddleware(app.wsgi_app)
+
+@app.before_request
+def reject_while_draining():
+    """Turn new requests away once shutdown has started"""
+    if not lifecycle.draining:
+        return None
+    lifecycle.record_rejected()
+    response = reject_request(503, "Server is shutting down, please retry", 1)
+    response.headers['Connection'] = 'close'
+    return response
+
+def close_resources():
+    """Close pooled clients at exit, first draining if a shutdown signal arrived (idempotent)"""
+    if lifecycle.closed:
+        return
+    lifecycle.closed = True
+    
+    # Only a shutdown signal waits for in-flight requests; any other exit
+    # (tests, a crashed server loop) must not hang on responses nobody closed
+    if lifecycle.draining:
+        remaining = SHUTDOWN_GRACE_SECONDS - (time.monotonic() - lifecycle.drain_started)
+        drained = lifecycle.wait_for_drain(max(0, remaining))
+        shutdown_ms = round((time.monotonic() - lifecycle.drain_started) * 1000, 2)
+    else:
+        drained = lifecycle.in_flight <= 0
+        shutdown_ms = 0
+    
+    # Close any open database connections or other resources here
+    # For example, if using SQLAlchemy:
+    # db.session.close_all()
+    # db.engine.dispose()
+    
+    # Close pooled HTTP, S3 and rate limit store connections
+    for name, client in (('http', _http_session), ('s3', _s3_client), ('redis', _redis_client)):
+        close = getattr(client, 'close', None)
+        if close is None:
+            continue
+        try:
+            close()
+        except Exception:
+            logger.warning("Failed to close client", extra={"client": name}, exc_info=True)
+    
+    logger.info("Shutdown complete", extra={
+        "drained": drained,
+        "in_flight_abandoned": max(0, lifecycle.in_flight),
+        "rejected_while_draining": lifecycle.dropped,
+        "shutdown_ms": shutdown_ms
+    })
+    # Flush any queued log records before exiting
+    stop_log_listener()
+
+def drain_and_stop():
+    """Wait for in-flight requests, then stop the server loop in the main thread"""
+    lifecycle.wait_for_drain(SHUTDOWN_GRACE_SECONDS)
+    # Delivers a second SIGINT to handle_shutdown_signal, which stops the
+    # server with KeyboardInterrupt; cleanup then runs from atexit
+    _thread.interrupt_main()
+
+_previous_signal_handlers = {}
+
+def handle_shutdown_signal(signal_num, frame):
+    """Start draining on SIGTERM/SIGINT without cutting off in-flight requests"""
+    first_signal = lifecycle.begin_draining()
+    if first_signal:
+        logger.info("Received shutdown signal, draining requests", extra={
+            "signal": signal.Signals(signal_num).name,
+            "in_flight": lifecycle.in_flight
+        })
+    
+    previous = _previous_signal_handlers.get(signal_num)
+    if callable(previous) and previous is not signal.default_int_handler:
+        # Let the server (e.g. a gunicorn worker) run its own graceful shutdown
+        previous(signal_num, frame)
+    elif not first_signal:
+        # Drained, or the operator insisted - stop now
+        raise KeyboardInterrupt
+    else:
+        # Never block here: the handler may be running on the thread that is
+        # serving one of the in-flight requests
+        threading.Thread(target=drain_and_stop, name='shutdown-drain', daemon=True).start()
+
+def install_worker_shutdown_hook(worker):
+    """Drain on SIGTERM in a gunicorn worker, then run the worker's own graceful exit"""
+    _previous_signal_handlers[signal.SIGTERM] = worker.handle_exit
+    signal.signal(signal.SIGTERM, handle_shutdown_signal)
+    # Keep gunicorn's setting: SIGTERM must not interrupt system calls
+    signal.siginterrupt(signal.SIGTERM, False)
+
+def reset_lifecycle_after_fork():
+    """Give each forked worker fresh request accounting"""
+    global lifecycle
+    lifecycle = RequestLifecycle()
+
+# Register the shutdown handler for the development server. gunicorn replaces
+# these handlers in its master and workers (see install_worker_shutdown_hook);
+# close_resources() runs from atexit in either case.
+for _signal_num in (signal.SIGINT, signal.SIGTERM):
+    _previous_signal_handlers[_signal_num] = signal.signal(_signal_num, handle_shutdown_signal)
+
+atexit.register(close_resources)
+
+# Admission control
+# Expensive routes have a per-worker concurrency cap, and requests that
+# already waited too long in front of the app are shed. Neither needs to know
+# who the caller is, so both are always on.
+#
+# On top of that, every request takes a token from the caller's global bucket
+# and from the caller's bucket for the route. Buckets live in Redis when
+# REDIS_URL is set, so limits are shared by all workers and pods, and in
+# worker memory otherwise (or while Redis is unreachable). Callers are
+# identified by their session user, else by client address. The SPA does not
+# send credentials, so behind a proxy the address is only meaningful once
+# TRUSTED_PROXY_HOPS is set to the number of proxies that append to
+# X-Forwarded-For (1 behind ingress-nginx). The buckets are off until then,
+# unless RATE_LIMIT_ENABLED says otherwise.
+TRUSTED_PROXY_HOPS = int(os.environ.get('TRUSTED_PROXY_HOPS', '0'))
+RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', '1' if TRUSTED_PROXY_HOPS else '0') == '1'
+RATE_LIMIT_MAX_LOCAL_BUCKETS = 50000
+
+def parse_route_limits(value, parse):
+    """Parse "route=value,route=value" settings"""
+    limits = {}
+    for entry in value.split(','):
+        if '=' in entry:
+            route, limit = entry.rsplit('=', 1)
+            try:
+                limits[route.strip()] = parse(limit)
+            except ValueError:
+                pass
+    return limits
+
+def parse_bucket(value):
+    """Parse "rate:burst", with rate in requests per second"""
+    rate, burst = value.split(':')
+    return float(rate), float(burst)
+
+# Per-user limit across all routes
+RATE_LIMIT_DEFAULT = parse_bucket(os.environ.get('RATE_LIMIT_DEFAULT', '20:40'))
+# Per-user limits for individual routes
+RATE_LIMITS = parse_route_limits(
+    os.environ.get('RATE_LIMITS', '/api/kubernetes/command=1:5,/api/kubernetes/s3-object=2:10,'
+                                  '/api/kubernetes/chat=1:5,/api/access/chat=1:5'),
+    parse_bucket
+)
+# Maximum concurrent requests per worker for expensive routes. A request over
+# the cap is shed at once instead of holding a thread while it waits, so the
+# caps only need to add up to less than the gunicorn --threads count (8 in the
+# API image) to always leave threads for the probes and other routes.
+CONCURRENCY_LIMITS = parse_route_limits(
+    os.environ.get('CONCURRENCY_LIMITS', '/api/kubernetes/command=2,/api/kubernetes/s3-object=2,'
+                                         '/api/kubernetes/chat=1,/api/access/chat=1'),
+    int
+)
+# Shed requests that spent longer than this queued before reaching the app,
+# based on the X-Request-Start header set by the ingress (0 disables)
+ADMISSION_MAX_QUEUE_MS = float(os.environ.get('ADMISSION_MAX_QUEUE_MS', '10000'))
+# Probe and admin routes are never limited
+RATE_LIMIT_EXEMPT_ROUTES = {'/api/kubernetes/clusters', '/api/about/health'}
+
+class LocalBucketStore:
+    """In-memory token buckets for a single worker"""
+    def __init__(self, max_buckets):
+        self.max_buckets = max_buckets
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst):
+        """Take one token, returning (allowed, seconds until a token is available)"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            if key not in self._buckets and len(self._buckets) >= self.max_buckets:
+                self._prune(now)
+            self._buckets[key] = (tokens, now)
+        return allowed, 0.0 if allowed else (1 - tokens) / rate
+
+    def _prune(self, now):
+        # Drop buckets idle long enough to have refilled completely
+        idle = [key for key, (tokens, updated) in self._buckets.items() if now - updated > 300]
+        for key in idle:
+            del self._buckets[key]
+        if len(self._buckets) >= self.max_buckets:
+            self._buckets.clear()
+
+class RedisBucketStore:
+    """Token buckets shared by all workers and pods through Redis"""
+    TAKE_SCRIPT = """
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+    local rate, burst, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+    local tokens = tonumber(bucket[1]) or burst
+    local updated = tonumber(bucket[2]) or now
+    tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+    local allowed = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+        allowed = 1
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+    return {allowed, tostring(tokens)}
+    """
+
+    def __init__(self, client):
+        self._take = client.register_script(self.TAKE_SCRIPT)
+
+    def take(self, key, rate, burst):
+        """Take one token, returning (allowed, seconds until a token is available)"""
+        allowed, tokens = self._take(keys=[f"ratelimit:{key}"], args=[rate, burst, time.time()])
+        if allowed:
+            return True, 0.0
+        return False, (1 - float(tokens)) / rate
+
+local_bucket_store = LocalBucketStore(RATE_LIMIT_MAX_LOCAL_BUCKETS)
+_redis_bucket_store = None
+concurrency_slots = {route: threading.BoundedSemaphore(limit) for route, limit in CONCURRENCY_LIMITS.items()}
+
+def take_token(key, rate, burst):
+    """Take a token from the shared store, falling back to worker memory"""
+    global _redis_bucket_store
+    try:
+        client = get_redis_client()
+        if client is not None:
+            if _redis_bucket_store is None:
+                _redis_bucket_store = RedisBucketStore(client)
+            return _redis_bucket_store.take(key, rate, burst)
+    except Exception:
+        logger.warning("Rate limit store unavailable, using local buckets", exc_info=True)
+        mark_redis_unavailable()
+    return local_bucket_store.take(key, rate, burst)
+
+def client_address():
+    """Client IP, trusting the last TRUSTED_PROXY_HOPS entries of X-Forwarded-For"""
+    if TRUSTED_PROXY_HOPS:
+        forwarded = [hop.strip() for hop in request.headers.get('X-Forwarded-For', '').split(',') if hop.strip()]
+        if len(forwarded) >= TRUSTED_PROXY_HOPS:
+            return forwarded[-TRUSTED_PROXY_HOPS]
+    return request.remote_addr
+
+def reject_request(status_code, message, retry_after):
+    """Build a 429/503 response with Retry-After"""
+    response = jsonify({"error": message})
+    response.status_code = status_code
+    response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response
+
+def reset_admission_state_after_fork():
+    """Replace locks and connections inherited from the gunicorn master"""
+    global _redis_bucket_store, concurrency_slots
+    _redis_bucket_store = None
+    local_bucket_store._lock = threading.Lock()
+    concurrency_slots = {route: threading.BoundedSemaphore(limit) for route, limit in CONCURRENCY_LIMITS.items()}
+
+@app.before_request
+def admit_request():
+    """Apply load shedding, per-user token buckets and concurrency caps"""
+    if request.method == 'OPTIONS':
+        return None
+    if request.path in RATE_LIMIT_EXEMPT_ROUTES or request.path.startswith('/api/admin/'):
+        return None
+    
+    # Shed work the client has most likely given up on already
+    if ADMISSION_MAX_QUEUE_MS and 'X-Request-Start' in request.headers:
+        try:
+            started = float(request.headers['X-Request-Start'].lstrip('t='))
+            # nginx sends seconds ($msec), other proxies milliseconds
+            if started < 1e11:
+                started *= 1000
+            queued_ms = time.time() * 1000 - started
+        except ValueError:
+            queued_ms = 0
+        if queued_ms > ADMISSION_MAX_QUEUE_MS:
+            logger.warning("Request shed after queueing", extra={"queued_ms": round(queued_ms, 2)})
+            return reject_request(503, "Server is overloaded, please retry", 1)
+    
+    if RATE_LIMIT_ENABLED:
+        user = session.get('user_id') or client_address() or 'anonymous'
+        allowed, retry_after = take_token(f"user:{user}", *RATE_LIMIT_DEFAULT)
+        if allowed and request.path in RATE_LIMITS:
+            allowed, retry_after = take_token(f"route:{request.path}:{user}", *RATE_LIMITS[request.path])
+        if not allowed:
+            logger.info("Request rate limited", extra={"user": user, "retry_after": round(retry_after, 2)})
+            return reject_request(429, "Too many requests, please slow down", retry_after)
+    
+    slots = concurrency_slots.get(request.path)
+    if slots is not None:
+        if not slots.acquire(blocking=False):
+            logger.warning("Request shed at concurrency limit", extra={"limit": CONCURRENCY_LIMITS[request.path]})
+            return reject_request(503, "Server is busy, please retry", 1)
+        g.concurrency_slot = slots
+    return None
+
+@app.teardown_request
+def release_concurrency_slot(exc=None):
+    """Free the concurrency slot taken by admit_request"""
+    slots = g.pop('concurrency_slot', None)
+    if slots is not None:
+        slots.release()
+
 # Allow CORS for all routes, with credentials support and multiple origins
 allowed_origins = os.environ.get('FLASK_CORS_ALLOW_ORIGINS', '*').split(',')
-CORS(app, supports_credentials=True, origins=allowed_origins, allow_headers=['Content-Type', 'Authorization'])
+CORS(app, supports_credentials=True, origins=allowed_origins, allow_headers=['Content-Type', 'Authorization', 'X-Request-ID', 'X-Profile', 'X-Admin-Token', 'If-None-Match'], expose_headers=['X-Request-ID', 'X-Profile-ID', 'ETag', 'Retry-After'])
 
 # Set a secret key for sessions
 app.secret_key = os.environ.get('FLASK_SECRET_KEY', str(uuid.uuid4()))
@@ -97,28 +903,93 @@ users = {
     }
 }
 
-# Function to gracefully shut down the app
-def graceful_shutdown(signal_num=None, frame=None):
-    print(f"Received signal {signal_num if signal_num else 'shutdown request'}")
-    print("Closing all connections and performing cleanup...")
-    
-    # Close any open database connections or other resources here
-    # For example, if using SQLAlchemy:
-    # db.session.close_all()
-    # db.engine.dispose()
-    
-    # Explicitly close any open requests session pools
-    requests.Session().close()
-    
-    print("Cleanup completed, shutting down...")
-    sys.exit(0)
+# Lazily built clients, shared by all requests in a worker
+_s3_client = None
+_http_session = None
+_clients_lock = threading.Lock()
+
+def get_s3_client():
+    """Return the shared S3 client, creating it on first use with the pod's IAM role"""
+    global _s3_client
+    if _s3_client is None:
+        with _clients_lock:
+            if _s3_client is None:
+                import boto3
+                _s3_client = boto3.client('s3', region_name=os.environ.get('AWS_REGION'))
+    return _s3_client
 
-# Register the shutdown function with signals
-signal.signal(signal.SIGINT, graceful_shutdown)
-signal.signal(signal.SIGTERM, graceful_shutdown)
+def get_http_session():
+    """Return the shared pooled HTTP session for outbound API calls"""
+    global _http_session
+    if _http_session is None:
+        with _clients_lock:
+            if _http_session is None:
+                import requests
+                from http.cookiejar import DefaultCookiePolicy
+                http_session = requests.Session()
+                # The session is shared between users, so never store cookies
+                http_session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+                _http_session = http_session
+    return _http_session
 
-# Also register at exit to catch non-signal terminations
-atexit.register(graceful_shutdown)
+# Optional Redis shared by all workers and pods, used for rate limit buckets
+# and the SAML replay cache. Callers fall back to per-worker state when it is
+# not configured or was unreachable within the last REDIS_RETRY_SECONDS.
+REDIS_URL = os.environ.get('REDIS_URL', '')
+REDIS_RETRY_SECONDS = 30
+_redis_client = None
+_redis_retry_at = 0.0
+
+def get_redis_client():
+    """Return the shared Redis client, or None if Redis should not be used right now"""
+    global _redis_client
+    if not REDIS_URL or time.monotonic() < _redis_retry_at:
+        return None
+    if _redis_client is None:
+        with _clients_lock:
+            if _redis_client is None:
+                import redis
+                _redis_client = redis.Redis.from_url(REDIS_URL, socket_timeout=0.1, socket_connect_timeout=0.1)
+    return _redis_client
+
+def mark_redis_unavailable():
+    """Stop using Redis for REDIS_RETRY_SECONDS after an error"""
+    global _redis_retry_at
+    _redis_retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+
+def reset_clients_after_fork():
+    """Drop clients inherited from the gunicorn master when running with --preload"""
+    global _s3_client, _http_session, _redis_client, _clients_lock
+    _s3_client = None
+    _http_session = None
+    _redis_client = None
+    _clients_lock = threading.Lock()
+
+def restart_log_listener_after_fork():
+    """Give each forked worker its own log queue and listener thread"""
+    global log_queue
+    log_queue = queue.Queue(-1)
+    _log_queue_handler.queue = log_queue
+    log_listener.queue = log_queue
+    log_listener._thread = None
+    log_listener.start()
+
+def reinit_after_fork():
+    """Rebuild per-process state in a freshly forked worker"""
+    reset_clients_after_fork()
+    reset_saml_state_after_fork()
+    reset_admission_state_after_fork()
+    reset_lifecycle_after_fork()
+    restart_log_listener_after_fork()
+
+# With gunicorn --preload the app is imported once in the master and workers
+# are forked from it. Freeze the imported objects so the garbage collector does
+# not touch (and un-share) their pages, and rebuild per-process state in workers.
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(
+        before=gc.freeze,
+        after_in_child=reinit_after_fork
+    )
 
 # SAML configuration
 def prepare_flask_request(request):
@@ -133,12 +1004,9 @@ def prepare_flask_request(request):
         'query_string': request.query_string
     }
 
-def init_saml_auth(req):
-    """Initialize SAML authentication object"""
-    if not SAML_ENABLED:
-        return None
-        
-    saml_settings = {
+def build_saml_settings():
+    """Build the SAML settings dict from the environment"""
+    return {
         "strict": True,
         "debug": True,
         "sp": {
@@ -168,10 +1036,146 @@ def init_saml_auth(req):
             "x509cert": os.environ.get('SAML_IDP_X509CERT', '')
         }
     }
+
+# Parsed SAML settings are shared by all requests in a worker. When
+# SAML_IDP_METADATA_URL is set the IdP endpoints and certificate are taken
+# from its metadata, which is refreshed every SAML_METADATA_REFRESH_SECONDS.
+SAML_IDP_METADATA_URL = os.environ.get('SAML_IDP_METADATA_URL', '')
+SAML_METADATA_REFRESH_SECONDS = int(os.environ.get('SAML_METADATA_REFRESH_SECONDS', '3600'))
+SAML_METADATA_RETRY_SECONDS = int(os.environ.get('SAML_METADATA_RETRY_SECONDS', '60'))
+
+_saml_settings = None
+_saml_settings_expires_at = 0.0
+_saml_settings_lock = threading.Lock()
+
+def load_idp_metadata():
+    """Fetch and parse the IdP metadata document"""
+    from onelogin.saml2.idp_metadata_parser import OneLogin_Saml2_IdPMetadataParser
+    
+    response = get_http_session().get(SAML_IDP_METADATA_URL, timeout=10)
+    response.raise_for_status()
+    return OneLogin_Saml2_IdPMetadataParser.parse(
+        response.text,
+        entity_id=os.environ.get('SAML_IDP_ENTITY_ID')
+    )
+
+def get_saml_settings():
+    """Return the parsed SAML settings, refreshing IdP metadata when it is stale"""
+    global _saml_settings, _saml_settings_expires_at
+    if _saml_settings is not None and time.monotonic() < _saml_settings_expires_at:
+        return _saml_settings
+    
+    if _saml_settings is None:
+        _saml_settings_lock.acquire()
+    elif not _saml_settings_lock.acquire(blocking=False):
+        # Another thread is refreshing; keep serving the current settings
+        return _saml_settings
+    
+    try:
+        if _saml_settings is not None and time.monotonic() < _saml_settings_expires_at:
+            return _saml_settings
+        
+        from onelogin.saml2.settings import OneLogin_Saml2_Settings
+        from onelogin.saml2.idp_metadata_parser import OneLogin_Saml2_IdPMetadataParser
+        
+        settings_data = build_saml_settings()
+        refresh_seconds = SAML_METADATA_REFRESH_SECONDS if SAML_IDP_METADATA_URL else float('inf')
+        if SAML_IDP_METADATA_URL:
+            try:
+                settings_data = OneLogin_Saml2_IdPMetadataParser.merge_settings(settings_data, load_idp_metadata())
+            except Exception:
+                logger.exception("Failed to load IdP metadata", extra={"url": SAML_IDP_METADATA_URL})
+                # Retry shortly rather than pinning stale or env-only settings
+                # until the next regular refresh
+                refresh_seconds = SAML_METADATA_RETRY_SECONDS
+                if _saml_settings is not None:
+                    # Keep the previous metadata meanwhile
+                    _saml_settings_expires_at = time.monotonic() + refresh_seconds
+                    return _saml_settings
+        
+        # Validates the settings and formats the IdP certificate once
+        _saml_settings = OneLogin_Saml2_Settings(settings_data)
+        _saml_settings_expires_at = time.monotonic() + refresh_seconds
+        return _saml_settings
+    finally:
+        _saml_settings_lock.release()
+
+def init_saml_auth(req):
+    """Initialize SAML authentication object"""
+    if not SAML_ENABLED:
+        return None
+    
+    from onelogin.saml2.auth import OneLogin_Saml2_Auth
     
-    auth = OneLogin_Saml2_Auth(req, saml_settings)
+    auth = OneLogin_Saml2_Auth(req, get_saml_settings())
     return auth
 
+# SAML assertion replay protection
+SAML_REPLAY_CACHE_SIZE = int(os.environ.get('SAML_REPLAY_CACHE_SIZE', '10000'))
+SAML_REPLAY_TTL_SECONDS = int(os.environ.get('SAML_REPLAY_TTL_SECONDS', '3600'))
+
+class AssertionReplayCache:
+    """Consumed assertion IDs, remembered until the assertion expires.
+
+    IDs are stored in Redis with SET NX EX when REDIS_URL is set, so a replay
+    is caught by every worker and pod. Without Redis they are kept in this
+    worker's memory and protection is best-effort: a replay that reaches
+    another worker or pod is not detected.
+    """
+    def __init__(self, max_size, ttl_seconds):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._expiry = {}
+        self._heap = []
+        self._lock = threading.Lock()
+
+    def _evict_expired(self, now):
+        # The heap is ordered by expiry time, not insertion order
+        while self._heap and self._heap[0][0] <= now:
+            expires_at, assertion_id = heapq.heappop(self._heap)
+            if self._expiry.get(assertion_id) == expires_at:
+                del self._expiry[assertion_id]
+
+    def _store_local(self, assertion_id, expires_at, now):
+        with self._lock:
+            self._evict_expired(now)
+            if assertion_id in self._expiry:
+                return False
+            if len(self._expiry) >= self.max_size:
+                # Dropping unexpired IDs would allow them to be replayed, so
+                # refuse new logins until some expire instead
+                raise RuntimeError("SAML replay cache is full")
+            self._expiry[assertion_id] = expires_at
+            heapq.heappush(self._heap, (expires_at, assertion_id))
+            return True
+
+    def check_and_store(self, assertion_id, not_on_or_after=None):
+        """Remember an assertion ID, returning False if it was already used"""
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        if not_on_or_after:
+            # The assertion is rejected by the toolkit once it expires, so it
+            # only needs to be remembered until then (plus clock skew)
+            expires_at = min(expires_at, not_on_or_after + 300)
+        
+        try:
+            client = get_redis_client()
+            if client is not None:
+                ttl = max(1, math.ceil(expires_at - now))
+                return bool(client.set(f"saml:assertion:{assertion_id}", 1, nx=True, ex=ttl))
+        except Exception:
+            logger.warning("Replay cache store unavailable, using local cache", exc_info=True)
+            mark_redis_unavailable()
+        return self._store_local(assertion_id, expires_at, now)
+
+saml_replay_cache = AssertionReplayCache(SAML_REPLAY_CACHE_SIZE, SAML_REPLAY_TTL_SECONDS)
+
+def reset_saml_state_after_fork():
+    """Replace SAML locks that may have been held when the worker was forked"""
+    global _saml_settings_lock
+    _saml_settings_lock = threading.Lock()
+    saml_replay_cache._lock = threading.Lock()
+
 # Authentication endpoints
 @app.route('/api/auth/login', methods=['POST'])
 def login():
@@ -314,8 +1318,8 @@ def github_callback():
         # Clear the state from the session
         session.pop('oauth_state', None)
         
-        # Create a session for the token request
-        token_session = requests.Session()
+        # Use the shared pooled session for the token request
+        token_session = get_http_session()
         
         # Exchange the authorization code for an access token
         token_url = "https://github.com/login/oauth/access_token"
@@ -327,7 +1331,8 @@ def github_callback():
         }
         
         # Make POST request to get access token
-        token_response = token_session.post(token_url, data=token_payload, headers={'Accept': 'application/json'})
+        with track_upstream('github', 'access_token'):
+            token_response = token_session.post(token_url, data=token_payload, headers={'Accept': 'application/json'})
         
         # Check if the token request was successful
         if token_response.status_code != 200:
@@ -346,14 +1351,16 @@ def github_callback():
         }
         
         # Get user profile
-        user_response = token_session.get(user_url, headers=headers)
+        with track_upstream('github', 'user'):
+            user_response = token_session.get(user_url, headers=headers)
         if user_response.status_code != 200:
             return jsonify({"error": "Failed to fetch user data"}), 400
         
         user_data = user_response.json()
         
         # Get user emails (to ensure we have the primary email)
-        emails_response = token_session.get(user_emails_url, headers=headers)
+        with track_upstream('github', 'user_emails'):
+            emails_response = token_session.get(user_emails_url, headers=headers)
         if emails_response.status_code != 200:
             return jsonify({"error": "Failed to fetch user emails"}), 400
         
@@ -370,9 +1377,6 @@ def github_callback():
             # If no primary email is found, use the first one
             primary_email = emails_data[0].get('email') if emails_data else user_data.get('email')
         
-        # Close the session to prevent resource leaks
-        token_session.close()
-        
         # Check if this GitHub user exists in our user database
         if primary_email not in users:
             # Create a new user
@@ -409,17 +1413,148 @@ def github_callback():
         return redirect(redirect_url)
     
     except Exception as e:
-        print(f"Error in GitHub callback: {e}")
-        # Ensure we close any open resources
-        if 'token_session' in locals():
-            token_session.close()
+        logger.exception("Error in GitHub callback")
         return jsonify({"error": f"GitHub authentication failed: {str(e)}"}), 500
 
+# SAML endpoints
+@app.route('/saml/login', methods=['GET'])
+def saml_login():
+    """Initiate SP-initiated SAML login"""
+    auth = init_saml_auth(prepare_flask_request(request))
+    if auth is None:
+        return jsonify({"error": "SAML authentication is not available"}), 501
+    
+    sso_url = auth.login()
+    
+    # Remember the AuthnRequest ID so the response can be matched to it
+    session['AuthNRequestID'] = auth.get_last_request_id()
+    
+    return redirect(sso_url)
+
+@app.route('/saml/acs', methods=['POST'])
+def saml_acs():
+    """Assertion Consumer Service - handle the SAML response from the IdP"""
+    auth = init_saml_auth(prepare_flask_request(request))
+    if auth is None:
+        return jsonify({"error": "SAML authentication is not available"}), 501
+    
+    request_id = session.pop('AuthNRequestID', None)
+    
+    try:
+        auth.process_response(request_id=request_id)
+    except Exception:
+        logger.exception("Error processing SAML response")
+        return jsonify({"error": "Invalid SAML response"}), 400
+    
+    errors = auth.get_errors()
+    if errors or not auth.is_authenticated():
+        logger.warning("SAML response rejected", extra={"errors": errors, "reason": auth.get_last_error_reason()})
+        return jsonify({"error": "Invalid SAML response"}), 400
+    
+    # Reject assertions that have already been consumed
+    assertion_id = auth.get_last_assertion_id()
+    if assertion_id:
+        try:
+            first_use = saml_replay_cache.check_and_store(assertion_id, auth.get_last_assertion_not_on_or_after())
+        except RuntimeError:
+            logger.error("SAML replay cache is full, rejecting login")
+            return reject_request(503, "Too many logins in progress, please retry", 30)
+        if not first_use:
+            logger.warning("SAML assertion replay rejected", extra={"assertion_id": assertion_id})
+            return jsonify({"error": "SAML assertion has already been used"}), 400
+    
+    email = auth.get_nameid()
+    attributes = auth.get_attributes()
+    display_name = (attributes.get('displayName') or attributes.get('name') or [email.split('@')[0]])[0]
+    
+    # Check if this SAML user exists in our user database
+    if email not in users:
+        users[email] = {
+            "id": str(uuid.uuid4()),
+            "name": display_name,
+            "email": email,
+            "password": None,  # SAML users don't need a password
+            "authenticated": True
+        }
+    
+    # Create user session, keeping what is needed for single logout
+    session['user_id'] = users[email]['id']
+    session['saml_nameid'] = email
+    session['saml_session_index'] = auth.get_session_index()
+    users[email]['authenticated'] = True
+    
+    # Return user info by redirecting to the frontend with user data
+    user_info = {
+        "id": users[email]['id'],
+        "name": users[email]['name'],
+        "email": email,
+        "photoUrl": users[email].get('photoUrl'),
+        "authenticated": True
+    }
+    
+    user_data_str = base64.b64encode(json.dumps(user_info).encode('utf-8')).decode('utf-8')
+    frontend_url = os.environ.get('FRONTEND_URL', 'http://localhost:5173')
+    redirect_url = f"{frontend_url}/auth/callback?user_data={quote(user_data_str)}"
+    
+    return redirect(redirect_url)
+
+@app.route('/saml/metadata', methods=['GET'])
+def saml_metadata():
+    """Return the SP metadata XML for registering with the IdP"""
+    if not SAML_ENABLED:
+        return jsonify({"error": "SAML authentication is not available"}), 501
+    
+    settings = get_saml_settings()
+    metadata = settings.get_sp_metadata()
+    errors = settings.validate_metadata(metadata)
+    if errors:
+        logger.error("Invalid SP metadata", extra={"errors": errors})
+        return jsonify({"error": f"Invalid SP metadata: {', '.join(errors)}"}), 500
+    
+    response = make_response(metadata, 200)
+    response.headers['Content-Type'] = 'text/xml'
+    return response
+
+@app.route('/saml/sls', methods=['GET'])
+def saml_sls():
+    """Single Logout Service - handle logout requests and responses from the IdP"""
+    auth = init_saml_auth(prepare_flask_request(request))
+    if auth is None:
+        return jsonify({"error": "SAML authentication is not available"}), 501
+    
+    def end_session():
+        user_id = session.get('user_id')
+        for user in users.values():
+            if user['id'] == user_id:
+                user['authenticated'] = False
+                break
+        session.clear()
+    
+    request_id = session.pop('LogoutRequestID', None)
+    redirect_url = auth.process_slo(request_id=request_id, delete_session_cb=end_session)
+    
+    errors = auth.get_errors()
+    if errors:
+        logger.warning("SAML logout rejected", extra={"errors": errors, "reason": auth.get_last_error_reason()})
+        return jsonify({"error": "Invalid SAML logout message"}), 400
+    
+    if redirect_url:
+        return redirect(redirect_url)
+    
+    frontend_url = os.environ.get('FRONTEND_URL', 'http://localhost:5173')
+    return redirect(f"{frontend_url}/login")
+
+def get_request_params():
+    """Read parameters from the query string for GET, or from the JSON body otherwise"""
+    if request.method == 'GET':
+        return request.args.to_dict()
+    return request.json
+
 # Access management endpoints
-@app.route('/api/access/groups', methods=['POST'])
+@app.route('/api/access/groups', methods=['GET', 'POST'])
 def get_user_groups():
     """Get groups for a user"""
-    data = request.json
+    data = get_request_params()
     if not data or 'userEmail' not in data:
         return jsonify({"error": "User email is required"}), 400
     
@@ -620,10 +1755,10 @@ def get_clusters():
     return jsonify(kubernetes_clusters)
 
 # Get namespaces for a cluster
-@app.route('/api/kubernetes/namespaces', methods=['POST'])
+@app.route('/api/kubernetes/namespaces', methods=['GET', 'POST'])
 def get_namespaces():
     """Return list of namespaces for a given cluster"""
-    data = request.json
+    data = get_request_params()
     cluster_name = data.get('cluster')
     if cluster_name and cluster_name in namespaces_by_cluster:
         return jsonify(namespaces_by_cluster[cluster_name])
@@ -661,10 +1796,10 @@ def kubernetes_chat():
     return jsonify({"response": response})
 
 # Get issues in a namespace
-@app.route('/api/kubernetes/namespace-issues', methods=['POST'])
+@app.route('/api/kubernetes/namespace-issues', methods=['GET', 'POST'])
 def get_namespace_issues():
     """Return list of issues for a given namespace"""
-    data = request.json
+    data = get_request_params()
     namespace = data.get('namespace')
     if namespace and namespace in namespace_issues:
         return jsonify(namespace_issues[namespace])
@@ -672,20 +1807,20 @@ def get_namespace_issues():
         return jsonify([]), 400
 
 # New endpoint to retrieve files directly from container filesystem with proper CORS handling
-@app.route('/api/kubernetes/file', methods=['POST', 'OPTIONS'])
+@app.route('/api/kubernetes/file', methods=['GET', 'POST', 'OPTIONS'])
 def get_file():
     """Retrieve a file from the container filesystem"""
     # Handle OPTIONS request for CORS preflight
     if request.method == 'OPTIONS':
         response = make_response()
         response.headers.add('Access-Control-Allow-Origin', '*')
-        response.headers.add('Access-Control-Allow-Methods', 'POST, OPTIONS')
+        response.headers.add('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
         response.headers.add('Access-Control-Allow-Headers', 'Content-Type, Authorization')
         response.headers.add('Access-Control-Max-Age', '3600')
         return response, 200
         
     try:
-        data = request.json
+        data = get_request_params()
         if not data or 'filePath' not in data:
             return jsonify({"error": "File path is required"}), 400
         
@@ -709,7 +1844,7 @@ def get_file():
             response[0].headers.add('Access-Control-Allow-Origin', '*')
             return response
             
-        print(f"Accessing file: {full_path}")
+        logger.info("Accessing file", extra={"file_path": full_path})
         
         # Check if file exists
         if not os.path.isfile(full_path):
@@ -741,13 +1876,13 @@ def get_file():
         
         # Add CORS headers directly to the response
         response.headers.add('Access-Control-Allow-Origin', '*')
-        response.headers.add('Access-Control-Allow-Methods', 'POST, OPTIONS')
+        response.headers.add('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
         response.headers.add('Access-Control-Allow-Headers', 'Content-Type, Authorization')
         
         return response
     
     except Exception as e:
-        print(f"Error processing file request: {str(e)}")
+        logger.exception("Error processing file request")
         response = jsonify({"error": f"Failed to retrieve file: {str(e)}"}), 500
         if isinstance(response, tuple) and len(response) > 0:
             # Add CORS headers to error response
@@ -772,20 +1907,24 @@ def get_s3_object():
         # Define bucket name - this is the only bucket we allow access to
         bucket_name = 'k8s-debugger-bucket'
         
-        print(f"Fetching S3 object from bucket: {bucket_name}, key: {file_path}")
+        logger.info("Fetching S3 object", extra={"bucket": bucket_name, "key": file_path})
+        
+        from botocore.exceptions import ClientError
         
         try:
             # Get S3 client using IAM role
             s3_client = get_s3_client()
             
             # Get the object
-            response = s3_client.get_object(
-                Bucket=bucket_name,
-                Key=file_path
-            )
+            with track_upstream('s3', 'get_object'):
+                response = s3_client.get_object(
+                    Bucket=bucket_name,
+                    Key=file_path
+                )
             
             # Read the content
-            file_content = response['Body'].read().decode('utf-8')
+            with track_upstream('s3', 'read_body'):
+                file_content = response['Body'].read().decode('utf-8')
             
             return jsonify({
                 "content": file_content,
@@ -795,7 +1934,7 @@ def get_s3_object():
         except ClientError as e:
             error_code = e.response['Error']['Code']
             error_message = e.response['Error']['Message']
-            print(f"S3 client error: {error_code} - {error_message}")
+            logger.warning("S3 client error", extra={"error_code": error_code, "error_message": error_message})
             
             if error_code == 'NoSuchKey':
                 return jsonify({"error": f"File not found: {file_path}"}), 404
@@ -805,9 +1944,52 @@ def get_s3_object():
                 return jsonify({"error": f"S3 error: {error_message}"}), 500
                 
     except Exception as e:
-        print(f"Error processing S3 object request: {str(e)}")
+        logger.exception("Error processing S3 object request")
         return jsonify({"error": f"Failed to retrieve S3 object: {str(e)}"}), 500
 
+# Profiling admin endpoints
+@app.route('/api/admin/profiles', methods=['GET'])
+def list_profiles():
+    """List captured request profiles, newest first"""
+    if not is_admin_request():
+        return jsonify({"error": "Not found"}), 404
+    
+    with captured_profiles_lock:
+        profiles = list(captured_profiles)
+    
+    return jsonify([
+        {key: value for key, value in profile.items() if key != 'stats'}
+        for profile in reversed(profiles)
+    ])
+
+@app.route('/api/admin/profiles/<profile_id>', methods=['GET'])
+def download_profile(profile_id):
+    """Download a captured profile as a pstats file, or as text with ?format=text"""
+    if not is_admin_request():
+        return jsonify({"error": "Not found"}), 404
+    
+    with captured_profiles_lock:
+        profile = next((p for p in captured_profiles if p["id"] == profile_id), None)
+    
+    if profile is None:
+        return jsonify({"error": f"Profile not found: {profile_id}"}), 404
+    
+    if request.args.get('format') == 'text':
+        # Human-readable summary sorted by cumulative time
+        limit = request.args.get('limit', 40, type=int)
+        stream = io.StringIO()
+        stats = pstats.Stats(_CapturedStats(profile["stats"]), stream=stream)
+        stats.sort_stats('cumulative').print_stats(limit)
+        response = make_response(stream.getvalue())
+        response.headers['Content-Type'] = 'text/plain; charset=utf-8'
+        return response
+    
+    # Binary pstats dump, loadable with `python -m pstats <file>`
+    response = make_response(marshal.dumps(profile["stats"]))
+    response.headers['Content-Type'] = 'application/octet-stream'
+    response.headers['Content-Disposition'] = f'attachment; filename="{profile_id}.pstats"'
+    return response
+
 if __name__ == '__main__':
     # Set up proper connection and socket handling for Gunicorn
     from werkzeug.serving import WSGIRequestHandler
@@ -834,5 +2016,5 @@ if __name__ == '__main__':
         
         app.run(host='0.0.0.0', port=8000, ssl_context=context)
     else:
-        print("Starting Flask application in HTTP mode...")
+        logger.info("Starting Flask application in HTTP mode...")
         app.run(host='0.0.0.0', port=8000, debug=True)
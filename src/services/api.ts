@@ -191,11 +191,9 @@ export const fetchFile = async (filePath: string): Promise<string> => {
     
     console.log(`Fetching file via backend: ${cleanPath}`);
     
-    // Always fetch via backend
-    const response = await apiCall<{ content: string }>(`/kubernetes/file`, {
-      method: 'POST',
-      body: JSON.stringify({ filePath: cleanPath }),
-    });
+    // Always fetch via backend. GET lets the browser cache revalidate with the ETag
+    const params = new URLSearchParams({ filePath: cleanPath });
+    const response = await apiCall<{ content: string }>(`/kubernetes/file?${params}`);
     
     console.log(`Successfully fetched file: ${filePath}`);
     return response.content;
@@ -207,10 +205,7 @@ export const fetchFile = async (filePath: string): Promise<string> => {
 
 export const accessApi = {
   getUserGroups: (userEmail: string) => 
-    apiCall<any[]>('/access/groups', {
-      method: 'POST',
-      body: JSON.stringify({ userEmail }),
-    }),
+    apiCall<any[]>(`/access/groups?${new URLSearchParams({ userEmail })}`),
 
   requestGroupAccess: (groupId: number, reason: string, userEmail: string) => 
     apiCall<JiraTicket>('/access/groups/request', {
@@ -313,10 +308,7 @@ export const kubernetesApi = {
       return Promise.reject(new Error('Cluster ARN is required'));
     }
     
-    return apiCall<string[]>(`/kubernetes/namespaces`, {
-      method: 'POST',
-      body: JSON.stringify({ clusterArn }),
-    });
+    return apiCall<string[]>(`/kubernetes/namespaces?${new URLSearchParams({ clusterArn })}`);
   },
 
   getNamespaceIssues: (clusterArn: string, namespace: string): Promise<NamespaceIssue[]> => {
@@ -327,10 +319,7 @@ export const kubernetesApi = {
       return Promise.reject(new Error('Namespace is required'));
     }
     
-    return apiCall<NamespaceIssue[]>(`/kubernetes/namespace-issues`, {
-      method: 'POST',
-      body: JSON.stringify({ clusterArn, namespace }),
-    });
+    return apiCall<NamespaceIssue[]>(`/kubernetes/namespace-issues?${new URLSearchParams({ clusterArn, namespace })}`);
   },
 
   getFile: (filePath: string): Promise<string> => {
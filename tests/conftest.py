@@ -0,0 +1,15 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+import sample_flask_kubernetes_api as api  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    return api.app.test_client()
@@ -0,0 +1,87 @@
+import threading
+import time
+
+import pytest
+
+import sample_flask_kubernetes_api as api
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    monkeypatch.setattr(api, 'RATE_LIMIT_ENABLED', True)
+    monkeypatch.setattr(api, 'TRUSTED_PROXY_HOPS', 1)
+    monkeypatch.setattr(api, 'RATE_LIMITS', {'/api/kubernetes/command': (0.001, 2)})
+    monkeypatch.setattr(api, 'local_bucket_store', api.LocalBucketStore(1000))
+
+
+def run_command(client, forwarded_for):
+    return client.post('/api/kubernetes/command', json={'command': 'get pods'},
+                       headers={'X-Forwarded-For': forwarded_for},
+                       environ_base={'REMOTE_ADDR': '10.0.0.1'})
+
+
+def test_without_trusted_proxy_callers_are_not_rate_limited(client):
+    # Every caller would share the proxy's address, so no buckets are used
+    for _ in range(10):
+        assert run_command(client, '203.0.113.1').status_code == 200
+
+
+def test_requests_queued_too_long_are_shed_by_default(client):
+    queued_since = time.time() - api.ADMISSION_MAX_QUEUE_MS / 1000 - 5
+
+    response = client.post('/api/kubernetes/command', json={'command': 'get pods'},
+                           headers={'X-Request-Start': f't={queued_since:.3f}'})
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+
+
+def test_flooded_capped_route_leaves_other_routes_served(client, monkeypatch):
+    monkeypatch.setattr(api, 'concurrency_slots', {'/api/kubernetes/command': threading.BoundedSemaphore(2)})
+    release = threading.Event()
+    running = threading.Semaphore(0)
+    view = api.app.view_functions['run_command']
+
+    def blocked_run_command():
+        running.release()
+        release.wait(10)
+        return view()
+
+    monkeypatch.setitem(api.app.view_functions, 'run_command', blocked_run_command)
+    flood = [threading.Thread(target=run_command, args=(api.app.test_client(), '203.0.113.1')) for _ in range(2)]
+    for thread in flood:
+        thread.start()
+    try:
+        for _ in flood:
+            assert running.acquire(timeout=5)
+
+        started = time.monotonic()
+        over_cap = run_command(client, '203.0.113.1')
+        assert over_cap.status_code == 503
+        assert over_cap.headers['Retry-After'] == '1'
+        # Shed at once rather than holding a thread while waiting for a slot
+        assert time.monotonic() - started < 1
+        assert client.get('/api/kubernetes/clusters').status_code == 200
+        assert client.get('/api/about').status_code == 200
+    finally:
+        release.set()
+        for thread in flood:
+            thread.join()
+
+
+def test_users_behind_one_proxy_get_separate_buckets(client, limiter):
+    statuses = [run_command(client, '203.0.113.1').status_code for _ in range(3)]
+
+    assert statuses == [200, 200, 429]
+    assert run_command(client, '203.0.113.2').status_code == 200
+
+
+def test_spoofed_forwarded_hops_are_ignored(client, limiter):
+    # Only the hop appended by the trusted proxy identifies the client
+    for spoofed in ('1.1.1.1', '2.2.2.2'):
+        run_command(client, f'{spoofed}, 203.0.113.1')
+
+    response = run_command(client, '3.3.3.3, 203.0.113.1')
+
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
@@ -0,0 +1,54 @@
+import datetime
+import gzip
+import json
+import uuid
+
+import pytest
+
+import sample_flask_kubernetes_api as api
+
+
+@pytest.mark.parametrize('value', [
+    datetime.datetime(2026, 10, 19, 6, 30, tzinfo=datetime.timezone.utc),
+    datetime.date(2026, 10, 19),
+    uuid.UUID('12345678-1234-5678-1234-567812345678'),
+    {1: 'non-string key'},
+    2 ** 70,
+])
+def test_output_does_not_depend_on_orjson(value, monkeypatch):
+    with api.app.app_context():
+        fast = api.json_dumps({'value': value})
+        monkeypatch.setattr(api, 'ORJSON_AVAILABLE', False)
+        stdlib = api.json_dumps({'value': value})
+
+    assert json.loads(fast) == json.loads(stdlib)
+
+
+def test_jsonify_is_compact_in_debug_mode(monkeypatch):
+    monkeypatch.setattr(api.app, 'debug', True)
+    with api.app.test_request_context():
+        response = api.jsonify({'a': [1, 2]})
+
+    assert response.get_data() == b'{"a":[1,2]}'
+
+
+def test_large_lists_are_streamed(monkeypatch):
+    monkeypatch.setattr(api, 'JSON_STREAM_MIN_ITEMS', 10)
+    monkeypatch.setattr(api, 'JSON_STREAM_CHUNK_BYTES', 16)
+    items = [{'name': f'pod-{i}'} for i in range(100)]
+    with api.app.test_request_context():
+        response = api.jsonify(items)
+
+    assert response.is_streamed
+    assert json.loads(b''.join(response.response)) == items
+
+
+def test_streamed_lists_are_gzipped(client, monkeypatch):
+    monkeypatch.setattr(api, 'JSON_STREAM_MIN_ITEMS', 2)
+    monkeypatch.setattr(api, 'JSON_STREAM_CHUNK_BYTES', 16)
+
+    response = client.get('/api/kubernetes/clusters', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert json.loads(gzip.decompress(response.data))
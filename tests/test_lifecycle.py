@@ -0,0 +1,62 @@
+import signal
+import time
+
+import pytest
+
+import sample_flask_kubernetes_api as api
+
+
+@pytest.fixture
+def lifecycle(monkeypatch):
+    state = api.RequestLifecycle()
+    monkeypatch.setattr(api, 'lifecycle', state)
+    monkeypatch.setattr(api, 'stop_log_listener', lambda: None)
+    return state
+
+
+def test_close_resources_does_not_wait_without_shutdown_signal(lifecycle, monkeypatch):
+    monkeypatch.setattr(api, 'SHUTDOWN_GRACE_SECONDS', 5)
+    # A response that was never closed keeps the request in flight
+    lifecycle.request_started()
+
+    started = time.monotonic()
+    api.close_resources()
+
+    assert time.monotonic() - started < 1
+    assert lifecycle.closed
+
+
+def test_draining_rejects_before_admission_control(client, lifecycle, monkeypatch):
+    monkeypatch.setattr(api, 'RATE_LIMIT_ENABLED', True)
+    monkeypatch.setattr(api, 'RATE_LIMITS', {'/api/kubernetes/command': (0.001, 1)})
+    monkeypatch.setattr(api, 'local_bucket_store', api.LocalBucketStore(1000))
+    lifecycle.begin_draining()
+
+    response = client.post('/api/kubernetes/command', json={'command': 'get pods'})
+
+    assert response.status_code == 503
+    assert response.headers['Connection'] == 'close'
+    assert lifecycle.dropped == 1
+    # The rejected request did not spend the caller's only token
+    assert len(api.local_bucket_store._buckets) == 0
+
+
+def test_worker_hook_drains_then_runs_worker_exit(lifecycle, monkeypatch):
+    class Worker:
+        alive = True
+
+        def handle_exit(self, sig, frame):
+            self.alive = False
+
+    monkeypatch.setattr(api, '_previous_signal_handlers', {})
+    previous = signal.getsignal(signal.SIGTERM)
+    worker = Worker()
+    try:
+        api.install_worker_shutdown_hook(worker)
+        api.handle_shutdown_signal(signal.SIGTERM, None)
+        assert signal.getsignal(signal.SIGTERM) is api.handle_shutdown_signal
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+
+    assert lifecycle.draining
+    assert worker.alive is False
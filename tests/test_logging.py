@@ -0,0 +1,80 @@
+import json
+import logging
+
+import pytest
+
+import sample_flask_kubernetes_api as api
+
+
+@pytest.fixture
+def log_lines():
+    """Collect the JSON lines the listener would write, in order"""
+    api.stop_log_listener()
+    level = api.logger.level
+    api.logger.setLevel(logging.INFO)
+    formatter = api.JsonLogFormatter()
+
+    def collect():
+        lines = []
+        while not api.log_queue.empty():
+            lines.append(json.loads(formatter.format(api.log_queue.get_nowait())))
+        return lines
+
+    yield collect
+    collect()
+    api.logger.setLevel(level)
+    api.log_listener.start()
+
+
+def access_records(lines):
+    return [line for line in lines if line['message'] == 'request completed']
+
+
+def test_sampled_out_info_records_are_dropped(client, log_lines, monkeypatch):
+    monkeypatch.setattr(api, 'LOG_SAMPLE_RATES', {'/api/about/health': 0.0})
+
+    assert client.get('/api/about/health').status_code == 200
+
+    assert access_records(log_lines()) == []
+
+
+def test_warnings_are_kept_on_sampled_routes(log_lines, monkeypatch):
+    monkeypatch.setattr(api, 'LOG_SAMPLE_RATES', {'/api/about/health': 0.0})
+
+    with api.app.test_request_context('/api/about/health'):
+        api.start_request_logging()
+        api.logger.info("sampled out")
+        api.logger.warning("always kept")
+
+    assert [line['message'] for line in log_lines()] == ['always kept']
+
+
+def test_server_errors_are_kept_on_sampled_routes(client, log_lines, monkeypatch):
+    monkeypatch.setattr(api, 'LOG_SAMPLE_RATES', {'/api/kubernetes/namespaces': 0.0})
+
+    response = client.post('/api/kubernetes/namespaces', data='not json', content_type='text/plain')
+
+    assert response.status_code == 500
+    lines = log_lines()
+    assert [line['status'] for line in access_records(lines)] == [500]
+    # Flask's traceback goes through the queue and carries the correlation ID
+    traceback, = [line for line in lines if line['logger'] == api.app.logger.name]
+    assert traceback['request_id'] == response.headers['X-Request-ID']
+    assert 'AttributeError' in traceback['exc_info']
+
+
+def test_request_id_is_echoed(client, log_lines):
+    response = client.get('/api/about/health', headers={'X-Request-ID': 'abc-123'})
+
+    assert response.headers['X-Request-ID'] == 'abc-123'
+
+
+def test_access_record_has_request_fields(client, log_lines):
+    client.get('/api/about', headers={'X-Request-ID': 'abc-123'})
+
+    record, = access_records(log_lines())
+    assert record['request_id'] == 'abc-123'
+    assert record['method'] == 'GET'
+    assert record['path'] == '/api/about'
+    assert record['status'] == 200
+    assert isinstance(record['elapsed_ms'], float)
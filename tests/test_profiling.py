@@ -0,0 +1,31 @@
+import sample_flask_kubernetes_api as api
+
+
+def test_non_ascii_admin_token_is_rejected(client, monkeypatch):
+    monkeypatch.setattr(api, 'PROFILING_ADMIN_TOKEN', 'secret')
+
+    response = client.get('/api/about', headers={'X-Profile': '1', 'X-Admin-Token': 's\xe9cret'})
+
+    assert response.status_code == 200
+    assert 'X-Profile-ID' not in response.headers
+
+
+def test_profile_id_is_generated_server_side(client, monkeypatch):
+    monkeypatch.setattr(api, 'PROFILING_ADMIN_TOKEN', 'secret')
+    headers = {'X-Admin-Token': 'secret'}
+
+    response = client.get('/api/about', headers={**headers, 'X-Profile': '1', 'X-Request-ID': 'abc'})
+
+    profile_id = response.headers['X-Profile-ID']
+    assert profile_id != 'abc'
+    profiles = client.get('/api/admin/profiles', headers=headers).json
+    assert profiles[0]['id'] == profile_id
+    assert profiles[0]['requestId'] == 'abc'
+    assert client.get(f'/api/admin/profiles/{profile_id}', headers=headers).status_code == 200
+
+
+def test_malformed_request_id_is_replaced(client):
+    response = client.get('/api/about', headers={'X-Request-ID': 'bad id"; x' * 10})
+
+    assert api.REQUEST_ID_PATTERN.match(response.headers['X-Request-ID'])
+    assert response.headers['X-Request-ID'] != 'bad id"; x' * 10
@@ -0,0 +1,66 @@
+import gzip
+
+import sample_flask_kubernetes_api as api
+
+
+def test_get_revalidation_returns_304(client):
+    first = client.get('/api/kubernetes/clusters')
+    etag = first.headers['ETag']
+
+    second = client.get('/api/kubernetes/clusters', headers={'If-None-Match': etag})
+
+    assert second.status_code == 304
+    assert second.data == b''
+    assert second.headers['ETag'] == etag
+    assert 'Accept-Encoding' in second.headers['Vary']
+
+
+def test_post_is_never_answered_with_304(client):
+    response = client.post('/api/kubernetes/namespaces', json={'cluster': 'cluster1'},
+                           headers={'If-None-Match': '*'})
+
+    assert response.status_code == 200
+    assert 'ETag' not in response.headers
+
+
+def test_read_only_endpoints_accept_get(client):
+    by_get = client.get('/api/kubernetes/namespace-issues?namespace=namespace-a')
+    by_post = client.post('/api/kubernetes/namespace-issues', json={'namespace': 'namespace-a'})
+
+    assert by_get.status_code == 200
+    assert by_get.json == by_post.json
+    assert 'ETag' in by_get.headers
+
+
+def test_large_responses_are_gzipped(client, tmp_path, monkeypatch):
+    monkeypatch.setenv('DEBUG_FILES_DIR', str(tmp_path))
+    (tmp_path / 'debug.log').write_text('pod restarted\n' * 1000)
+
+    response = client.get('/api/kubernetes/file?filePath=debug.log', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert b'pod restarted' in gzip.decompress(response.data)
+
+
+def test_small_responses_are_not_compressed(client):
+    response = client.get('/api/about', headers={'Accept-Encoding': 'gzip'})
+
+    assert len(response.data) < api.COMPRESSION_MIN_BYTES
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_incompressible_bodies_are_only_trial_compressed(client, tmp_path, monkeypatch):
+    encoded = []
+
+    def no_saving(data):
+        encoded.append(len(data))
+        return data
+
+    monkeypatch.setattr(api, 'response_encoders', [('gzip', no_saving)])
+    monkeypatch.setenv('DEBUG_FILES_DIR', str(tmp_path))
+    (tmp_path / 'debug.log').write_text('x' * (4 * api.COMPRESSION_SAMPLE_BYTES))
+
+    response = client.get('/api/kubernetes/file?filePath=debug.log', headers={'Accept-Encoding': 'gzip'})
+
+    assert 'Content-Encoding' not in response.headers
+    assert encoded == [api.COMPRESSION_SAMPLE_BYTES]
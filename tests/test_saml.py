@@ -0,0 +1,103 @@
+import sys
+import time
+import types
+
+import pytest
+
+import sample_flask_kubernetes_api as api
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = (value, ex)
+        return True
+
+
+def test_replayed_assertion_is_rejected():
+    cache = api.AssertionReplayCache(max_size=10, ttl_seconds=60)
+
+    assert cache.check_and_store('assertion-1') is True
+    assert cache.check_and_store('assertion-1') is False
+    assert cache.check_and_store('assertion-2') is True
+
+
+def test_expired_ids_are_evicted_regardless_of_insertion_order():
+    cache = api.AssertionReplayCache(max_size=2, ttl_seconds=60)
+    cache.check_and_store('long-lived')
+    # Inserted second but expires first
+    cache.check_and_store('short-lived', not_on_or_after=time.time() - 300 + 0.05)
+    time.sleep(0.1)
+
+    assert cache.check_and_store('new') is True
+    assert cache.check_and_store('long-lived') is False
+    assert set(cache._expiry) == {'long-lived', 'new'}
+
+
+def test_full_cache_never_evicts_unexpired_ids():
+    cache = api.AssertionReplayCache(max_size=2, ttl_seconds=60)
+    cache.check_and_store('a')
+    cache.check_and_store('b')
+
+    with pytest.raises(RuntimeError):
+        cache.check_and_store('c')
+    assert cache.check_and_store('a') is False
+    assert cache.check_and_store('b') is False
+
+
+def test_assertion_ids_are_shared_through_redis(monkeypatch):
+    redis = FakeRedis()
+    monkeypatch.setattr(api, 'get_redis_client', lambda: redis)
+    worker_1 = api.AssertionReplayCache(max_size=10, ttl_seconds=60)
+    worker_2 = api.AssertionReplayCache(max_size=10, ttl_seconds=60)
+
+    assert worker_1.check_and_store('assertion-1', not_on_or_after=time.time() + 30) is True
+    assert worker_2.check_and_store('assertion-1') is False
+    assert redis.values['saml:assertion:assertion-1'][1] == 60
+
+
+@pytest.fixture
+def saml_settings(monkeypatch):
+    """Stand-ins for the onelogin modules get_saml_settings() imports"""
+    metadata = {}
+
+    class Settings:
+        def __init__(self, data):
+            self.data = data
+
+    class MetadataParser:
+        @staticmethod
+        def merge_settings(settings, idp_metadata):
+            return dict(settings, idp=idp_metadata)
+
+    def load_idp_metadata():
+        if 'idp' not in metadata:
+            raise OSError("IdP unreachable")
+        return metadata['idp']
+
+    monkeypatch.setitem(sys.modules, 'onelogin.saml2.settings', types.SimpleNamespace(OneLogin_Saml2_Settings=Settings))
+    monkeypatch.setitem(sys.modules, 'onelogin.saml2.idp_metadata_parser',
+                        types.SimpleNamespace(OneLogin_Saml2_IdPMetadataParser=MetadataParser))
+    monkeypatch.setattr(api, 'load_idp_metadata', load_idp_metadata)
+    monkeypatch.setattr(api, 'build_saml_settings', lambda: {'idp': 'env-only'})
+    monkeypatch.setattr(api, 'SAML_IDP_METADATA_URL', 'https://idp.test/metadata')
+    monkeypatch.setattr(api, '_saml_settings', None)
+    monkeypatch.setattr(api, '_saml_settings_expires_at', 0.0)
+    return metadata
+
+
+def test_failed_first_metadata_fetch_is_retried_soon(saml_settings):
+    settings = api.get_saml_settings()
+
+    assert settings.data == {'idp': 'env-only'}
+    assert api._saml_settings_expires_at <= time.monotonic() + api.SAML_METADATA_RETRY_SECONDS
+
+    saml_settings['idp'] = 'from-metadata'
+    api._saml_settings_expires_at = 0.0
+
+    assert api.get_saml_settings().data == {'idp': 'from-metadata'}
+    assert api._saml_settings_expires_at > time.monotonic() + api.SAML_METADATA_RETRY_SECONDS